@@ -0,0 +1 @@
+modification_time  # unused variable (src/convert.py:37)
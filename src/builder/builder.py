@@ -1,7 +1,7 @@
 """Abstract document builder class."""
 
 import pathlib
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 from custom_types import TreeBuilderAttributes
 
@@ -24,14 +24,17 @@ class Builder:
 
     def in_element(self, tag: str, attributes: TreeBuilderAttributes = None) -> bool:
         """Return whether we are currently in an element with the specified tag and attributes."""
-        return self.nr_elements(tag, attributes) > 0
+        return any(self._matching_elements(tag, attributes or {}))
 
     def nr_elements(self, tag: str, attributes: TreeBuilderAttributes = None) -> int:
         """Return how many elements with the specified tag and attributes are currently being built."""
-        attributes = attributes or {}
-        return len(
-            [element for element in self._stack if tag == element[0] and attributes.items() <= element[1].items()]
-        )
+        return sum(1 for _ in self._matching_elements(tag, attributes or {}))
+
+    def _matching_elements(
+        self, tag: str, attributes: TreeBuilderAttributes
+    ) -> Iterator[Tuple[str, TreeBuilderAttributes]]:
+        """Return the elements with the specified tag and attributes that are currently being built."""
+        return (element for element in self._stack if tag == element[0] and attributes.items() <= element[1].items())
 
     def start_element(self, tag: str, attributes: TreeBuilderAttributes) -> None:
         """Start element."""
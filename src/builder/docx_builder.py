@@ -1,13 +1,16 @@
 """Docx builder."""
 
+import functools
 import pathlib
 import shutil
-from typing import List, Optional
+from copy import deepcopy
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from docx import Document
-from docx.enum.text import WD_COLOR_INDEX, WD_PARAGRAPH_ALIGNMENT
+from docx.enum.text import WD_BREAK, WD_COLOR_INDEX, WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.table import CT_Row
 from docx.table import Table
-from docx.table import _Row as Row
+from docx.table import _Cell as Cell
 from docx.text.paragraph import Paragraph
 
 import xmltags
@@ -17,10 +20,14 @@ from .hyperlink import add_hyperlink
 from .table_of_contents import add_table_of_contents
 
 
-class DocxBuilder(Builder):
+class DocxBuilder(Builder):  # pylint: disable=too-many-instance-attributes
     """Docx builder."""
 
+    # pylint: disable=unused-argument
+
     SCHEMA = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    TABLE_WIDTH, TABLE_CELL_PROPERTIES, TABLE_CELL_WIDTH = f"{SCHEMA}tblW", f"{SCHEMA}tcPr", f"{SCHEMA}tcW"
+    WIDTH_TYPE, WIDTH_W = f"{SCHEMA}type", f"{SCHEMA}w"
     TEXT_TAGS = (
         xmltags.PARAGRAPH,
         xmltags.LIST_ITEM,
@@ -34,117 +41,202 @@ class DocxBuilder(Builder):
         xmltags.ITALIC,
         xmltags.STRIKETHROUGH,
     )
+    BOLD_BIT, INSTRUCTION_BIT, ITALIC_BIT, STRIKETHROUGH_BIT = 1, 2, 4, 8
+    FORMAT_BITS = {
+        xmltags.BOLD: BOLD_BIT,
+        xmltags.INSTRUCTION: INSTRUCTION_BIT,
+        xmltags.ITALIC: ITALIC_BIT,
+        xmltags.STRIKETHROUGH: STRIKETHROUGH_BIT,
+    }
+    ALIGNMENTS = dict(
+        left=WD_PARAGRAPH_ALIGNMENT.LEFT,  # pylint: disable=no-member
+        right=WD_PARAGRAPH_ALIGNMENT.RIGHT,  # pylint: disable=no-member
+        center=WD_PARAGRAPH_ALIGNMENT.CENTER,  # pylint: disable=no-member
+    )
 
     def __init__(self, filename: pathlib.Path, docx_reference_filename: pathlib.Path) -> None:
         super().__init__(filename)
         filename.unlink(missing_ok=True)
-        shutil.copy(docx_reference_filename, filename)
+        shutil.copyfile(docx_reference_filename, filename)
         self.doc = Document(filename)
+        # Empty paragraph at the end of the body. New content is inserted before it, because Document.add_paragraph
+        # searches the whole body for the section properties each time it adds a paragraph
+        self.end_paragraph = self.doc.add_paragraph()
+        # pylint: disable=protected-access
+        self.numbering = self.doc.part.numbering_part.numbering_definitions._numbering
         self.paragraph: Optional[Paragraph] = None  # The current paragraph
-        self.current_list_style: List[str] = []  # Stack of list styles
-        self.previous_list_item: List[Optional[Paragraph]] = []  # Stack of previous list items
+        self.formatting: List[int] = [0]  # Stack of bitmasks of the formats of the current text
+        self.lists: List[Tuple[str, Optional[int]]] = []  # Stack of list styles and numbering ids of numbered lists
         self.table: Optional[Table] = None
-        self.row: Optional[Row] = None
+        self.table_rows: Iterator[CT_Row] = iter([])  # The rows of the current table that have not been started yet
+        self.row_cells: List[Cell] = []  # The cells of the current table row
         self.column_index = 0
+        self.links: List[str] = []  # Stack of links of the anchors being built
+        self.start_handlers: Dict[str, Callable[[TreeBuilderAttributes], None]] = {
+            xmltags.PARAGRAPH: self._add_paragraph,
+            xmltags.PAGEBREAK: self._add_page_break,
+            xmltags.BULLET_LIST: self._start_bullet_list,
+            xmltags.NUMBERED_LIST: self._start_numbered_list,
+            xmltags.LIST_ITEM: self._add_list_item,
+            xmltags.HEADING: self._add_heading,
+            xmltags.TABLE: self._add_table,
+            xmltags.TABLE_HEADER_ROW: self._add_table_row,
+            xmltags.TABLE_ROW: self._add_table_row,
+            xmltags.TABLE_CELL: self._add_table_cell,
+            xmltags.HEADER: self._add_header,
+            xmltags.TITLE: self._add_title,
+            xmltags.TABLE_OF_CONTENTS: self._add_table_of_contents,
+            xmltags.IMAGE: self._add_image,
+            xmltags.ANCHOR: self._start_anchor,
+        }
+        self.end_handlers: Dict[str, Callable[[TreeBuilderAttributes], None]] = {
+            xmltags.BULLET_LIST: self._end_list,
+            xmltags.NUMBERED_LIST: self._end_list,
+            xmltags.ANCHOR: self._end_anchor,
+        }
 
-    def start_element(self, tag: str, attributes: TreeBuilderAttributes) -> None:  # pylint:disable=too-many-branches
-        # pylint: disable=protected-access
+    def start_element(self, tag: str, attributes: TreeBuilderAttributes) -> None:
         super().start_element(tag, attributes)
-        if tag == xmltags.PARAGRAPH:
-            self.paragraph = self.doc.add_paragraph(style="Maatregel" if self.in_element(xmltags.MEASURE) else None)
-        elif tag == xmltags.PAGEBREAK:
-            self.doc.add_page_break()
-        elif tag == xmltags.BULLET_LIST:
-            self.current_list_style.append("Lijst opsom.teken1")
-            self.previous_list_item.append(None)
-        elif tag == xmltags.NUMBERED_LIST:
-            self.current_list_style.append("Lijstnummering1")
-            self.previous_list_item.append(None)
-        elif tag == xmltags.LIST_ITEM:
-            self._add_list_item()
-        elif tag == xmltags.HEADING:
-            level = self.nr_elements(xmltags.SECTION)
-            in_appendix = self.in_element(xmltags.SECTION, {xmltags.SECTION_IS_APPENDIX: "y"})
-            style = f"Kop {level} Bijlage" if in_appendix else f"heading {level}"
-            self.paragraph = self.doc.add_paragraph(style=style)
-        elif tag == xmltags.TABLE:
-            self.table = self.doc.add_table(0, int(attributes[xmltags.TABLE_COLUMNS]), style="Tabelraster1")
-            # Set table width to 100%
-            self.table._tbl.tblPr.xpath("./w:tblW")[0].attrib[f"{self.SCHEMA}type"] = "pct"
-            self.table._tbl.tblPr.xpath("./w:tblW")[0].attrib[f"{self.SCHEMA}w"] = "100%"
-        elif tag in (xmltags.TABLE_HEADER_ROW, xmltags.TABLE_ROW):
-            assert self.table
-            self.row = self.table.add_row()
-            self.column_index = 0
-        elif tag == xmltags.TABLE_CELL:
-            self._add_table_cell(attributes)
-        elif tag == xmltags.HEADER:
-            self.paragraph = self.doc.sections[0].header.paragraphs[0]
-            self.paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT  # pylint: disable=no-member
-        elif tag == xmltags.TITLE:
-            self.paragraph = self.doc.add_paragraph(style="Title")
-        elif tag == xmltags.TABLE_OF_CONTENTS:
-            self.doc.add_paragraph(attributes[xmltags.TABLE_OF_CONTENTS_HEADING], style="TOC Heading")
-            add_table_of_contents(self.doc.add_paragraph())
-        elif tag == xmltags.IMAGE:
-            self.doc.add_picture(attributes["src"][len("/work/") :])
-
-    def _add_list_item(self) -> None:
+        if handler := self.start_handlers.get(tag):
+            handler(attributes)
+        elif tag in self.FORMAT_BITS:
+            self.formatting.append(self.formatting[-1] | self.FORMAT_BITS[tag])
+
+    def _add_paragraph(self, attributes: TreeBuilderAttributes) -> None:
+        """Add a paragraph."""
+        self.paragraph = self._insert_paragraph(style="Maatregel" if self.in_element(xmltags.MEASURE) else None)
+
+    def _add_page_break(self, attributes: TreeBuilderAttributes) -> None:
+        """Add a page break."""
+        self._insert_paragraph().add_run().add_break(WD_BREAK.PAGE)
+
+    def _start_bullet_list(self, attributes: TreeBuilderAttributes) -> None:
+        """Start a bullet list."""
+        self.lists.append(("Lijst opsom.teken1", None))
+
+    def _start_numbered_list(self, attributes: TreeBuilderAttributes) -> None:
+        """Start a numbered list."""
+        self.lists.append(("Lijstnummering1", None))
+
+    def _add_heading(self, attributes: TreeBuilderAttributes) -> None:
+        """Add a heading."""
+        level = self.nr_elements(xmltags.SECTION)
+        in_appendix = self.in_element(xmltags.SECTION, {xmltags.SECTION_IS_APPENDIX: "y"})
+        self.paragraph = self._insert_paragraph(style=self._heading_style(level, in_appendix))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _heading_style(level: int, in_appendix: bool) -> str:
+        """Return the style of headings at the level."""
+        return f"Kop {level} Bijlage" if in_appendix else f"heading {level}"
+
+    def _add_table(self, attributes: TreeBuilderAttributes) -> None:
+        """Add a table."""
+        # pylint: disable=protected-access
+        self.table = self.doc.add_table(0, int(attributes[xmltags.TABLE_COLUMNS]), style="Tabelraster1")
+        self.end_paragraph._p.addprevious(self.table._tbl)
+        # Set table width to 100%
+        table_width = self.table._tbl.tblPr.find(self.TABLE_WIDTH)
+        table_width.set(self.WIDTH_TYPE, "pct")
+        table_width.set(self.WIDTH_W, "100%")
+        # Create all rows at once; the header row is not included in the number of rows
+        row_template = self._create_row_template(self.table)
+        rows = [deepcopy(row_template) for _ in range(int(attributes[xmltags.TABLE_ROWS]) + 1)]
+        self.table._tbl.extend(rows)
+        self.table_rows = iter(rows)
+
+    @classmethod
+    def _create_row_template(cls, table: Table) -> CT_Row:
+        """Create a table row for the table, with cells that have an automatic width."""
+        # pylint: disable=protected-access
+        row = table.add_row()._tr
+        for cell in row.tc_lst:
+            cell.find(cls.TABLE_CELL_PROPERTIES).find(cls.TABLE_CELL_WIDTH).set(cls.WIDTH_TYPE, "auto")
+        table._tbl.remove(row)
+        return row
+
+    def _add_table_row(self, attributes: TreeBuilderAttributes) -> None:
+        """Add a table row."""
+        assert self.table
+        row = next(self.table_rows)
+        # Create the cells from the row's own cell elements; Row.cells lays out the grid of the whole table
+        self.row_cells = [Cell(tc, self.table) for tc in row.tc_lst]
+        self.column_index = 0
+
+    def _add_list_item(self, attributes: TreeBuilderAttributes) -> None:
         """Add a list item."""
         # pylint: disable=protected-access
-        self.paragraph = self.doc.add_paragraph(style=self.current_list_style[-1])
-        level = len(self.current_list_style) - 1
-        self.paragraph._p.get_or_add_pPr().get_or_add_numPr().get_or_add_ilvl().val = level
-        if self.current_list_style[-1] == "Lijstnummering1":
-            if self.previous_list_item[-1] is None:
+        style, numbering_id = self.lists[-1]
+        self.paragraph = self._insert_paragraph(style=style)
+        level = len(self.lists) - 1
+        numbering_properties = self.paragraph._p.get_or_add_pPr().get_or_add_numPr()
+        numbering_properties.get_or_add_ilvl().val = level
+        if style == "Lijstnummering1":
+            if numbering_id is None:
                 # Add a new concrete numbering for Lijstnummering1. "0" is the id of the abstract numbering of
                 # Lijstnummering1. This id can be found in the word/numbering.xml file (unzip reference.docx so
                 # see word/numbering.xml), look for the <w:abstractNum w:abstractNumId="0" ...> that has a
                 # child element <w:pStyle w:val="Lijstnummering1"/>
-                num = self.doc.part.numbering_part.numbering_definitions._numbering.add_num("0")
+                num = self.numbering.add_num("0")
                 num.add_lvlOverride(ilvl=level).add_startOverride(1)  # Restart the numbering
-                num = num.numId
-            else:
-                num = self.previous_list_item[-1]._p.pPr.numPr.numId.val
-            self.paragraph._p.get_or_add_pPr().get_or_add_numPr().get_or_add_numId().val = num
-        self.previous_list_item[-1] = self.paragraph
+                # Remember the numbering id so the next items of this list don't need to look it up
+                numbering_id = num.numId
+                self.lists[-1] = (style, numbering_id)
+            numbering_properties.get_or_add_numId().val = numbering_id
 
     def _add_table_cell(self, attributes: TreeBuilderAttributes) -> None:
         """Add a table cell."""
-        # pylint: disable=protected-access
-        assert self.row
-        cell = self.row.cells[self.column_index]
-        cell._tc.tcPr.tcW.type = "auto"
+        cell = self.row_cells[self.column_index]
         self.paragraph = cell.paragraphs[0]
-        if alignment_attr := attributes.get(xmltags.TABLE_CELL_ALIGNMENT):
-            # pylint: disable=no-member
-            alignment = dict(
-                left=WD_PARAGRAPH_ALIGNMENT.LEFT,
-                right=WD_PARAGRAPH_ALIGNMENT.RIGHT,
-                center=WD_PARAGRAPH_ALIGNMENT.CENTER,
-            )[str(alignment_attr)]
-            self.paragraph.paragraph_format.alignment = alignment
+        if alignment := attributes.get(xmltags.TABLE_CELL_ALIGNMENT):
+            self.paragraph.paragraph_format.alignment = self.ALIGNMENTS[str(alignment)]
         self.column_index += 1
 
+    def _add_header(self, attributes: TreeBuilderAttributes) -> None:
+        """Add the page header."""
+        self.paragraph = self.doc.sections[0].header.paragraphs[0]
+        self.paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT  # pylint: disable=no-member
+
+    def _add_title(self, attributes: TreeBuilderAttributes) -> None:
+        """Add the document title."""
+        self.paragraph = self._insert_paragraph(style="Title")
+
+    def _add_table_of_contents(self, attributes: TreeBuilderAttributes) -> None:
+        """Add the table of contents."""
+        self._insert_paragraph(str(attributes[xmltags.TABLE_OF_CONTENTS_HEADING]), style="TOC Heading")
+        add_table_of_contents(self._insert_paragraph())
+
+    def _add_image(self, attributes: TreeBuilderAttributes) -> None:
+        """Add an image."""
+        self._insert_paragraph().add_run().add_picture(attributes["src"][len("/work/") :])
+
+    def _start_anchor(self, attributes: TreeBuilderAttributes) -> None:
+        """Start an anchor."""
+        self.links.append(str(attributes[xmltags.ANCHOR_LINK]))
+
+    def _insert_paragraph(self, text: str = "", style: Optional[str] = None) -> Paragraph:
+        """Insert a paragraph at the end of the document, before the end paragraph."""
+        return self.end_paragraph.insert_paragraph_before(text, style)
+
     def text(self, tag: str, text: str, attributes: TreeBuilderAttributes) -> None:
         if tag in self.TEXT_TAGS:
             assert self.paragraph
             run = self.paragraph.add_run(text)
-            if self.in_element(xmltags.BOLD):
-                run.font.bold = True
-            if self.in_element(xmltags.INSTRUCTION):
-                run.font.highlight_color = WD_COLOR_INDEX.YELLOW  # pylint: disable=no-member
-            if self.in_element(xmltags.ITALIC):
-                run.font.italic = True
-            if self.in_element(xmltags.STRIKETHROUGH):
-                run.font.strike = True
+            formatting = self.formatting[-1]
+            if not formatting:
+                return  # Plain text, no need to access the font
+            font = run.font
+            if formatting & self.BOLD_BIT:
+                font.bold = True
+            if formatting & self.INSTRUCTION_BIT:
+                font.highlight_color = WD_COLOR_INDEX.YELLOW  # pylint: disable=no-member
+            if formatting & self.ITALIC_BIT:
+                font.italic = True
+            if formatting & self.STRIKETHROUGH_BIT:
+                font.strike = True
         elif tag == xmltags.ANCHOR:
             assert self.paragraph
-            try:
-                link = str(attributes[xmltags.ANCHOR_LINK])
-            except KeyError:
-                print(tag, text, attributes)
-                raise
+            link = self.links[-1]
             if link.startswith("#"):
                 self.paragraph.add_run(text)  # Implement internal links some day
             else:
@@ -152,9 +244,20 @@ class DocxBuilder(Builder):
 
     def end_element(self, tag: str, attributes: TreeBuilderAttributes) -> None:
         super().end_element(tag, attributes)
-        if tag in (xmltags.BULLET_LIST, xmltags.NUMBERED_LIST):
-            self.current_list_style.pop()
-            self.previous_list_item.pop()
+        if handler := self.end_handlers.get(tag):
+            handler(attributes)
+        elif tag in self.FORMAT_BITS:
+            self.formatting.pop()
+
+    def _end_list(self, attributes: TreeBuilderAttributes) -> None:
+        """End a bullet or numbered list."""
+        self.lists.pop()
+
+    def _end_anchor(self, attributes: TreeBuilderAttributes) -> None:
+        """End an anchor."""
+        self.links.pop()
 
     def end_document(self) -> None:
+        end_paragraph = self.end_paragraph._p  # pylint: disable=protected-access
+        end_paragraph.getparent().remove(end_paragraph)
         self.doc.save(self.filename)
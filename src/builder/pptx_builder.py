@@ -24,7 +24,7 @@ class PptxBuilder(Builder):
     def __init__(self, filename: pathlib.Path, pptx_reference_filename: pathlib.Path) -> None:
         super().__init__(filename)
         filename.unlink(missing_ok=True)
-        shutil.copy(pptx_reference_filename, filename)
+        shutil.copyfile(pptx_reference_filename, filename)
         self.presentation = Presentation(filename)
         # Make the title placeholder on the measure slide wider
         measure_master_slide = self.presentation.slide_master.slide_layouts[self.CONTENT_SLIDE]
@@ -61,8 +61,9 @@ class PptxBuilder(Builder):
         ):
             self.chapter_heading = text
         elif tag == xmltags.LIST_ITEM and self.in_element(xmltags.SLIDE):
-            text_frame = self.current_slide.shapes[1].text_frame  # type: ignore
-            if self.current_slide.shapes[1].text.strip():  # type: ignore
+            text_box = self.current_slide.shapes[1]  # type: ignore
+            text_frame = text_box.text_frame
+            if text_box.text.strip():
                 paragraph = text_frame.add_paragraph()
             else:
                 paragraph = text_frame.paragraphs[0]
@@ -201,15 +201,16 @@ class XlsxBuilder(Builder):  # pylint: disable=too-many-instance-attributes
     def __write_assessment_choices(self, row: int, column: int) -> None:
         """Write the assessment choices, colors and data validation in the status column."""
         assessment_choices = ["voldoet", "voldoet deels", "voldoet niet", "niet van toepassing"]
+        checklist, formats = self.checklist, self.formats
         for choice in assessment_choices:
-            self.checklist.conditional_format(
+            checklist.conditional_format(
                 row,
                 column,
                 row,
                 column,
-                {"type": "cell", "criteria": "==", "value": f'"{choice}"', "format": self.formats[choice]},
+                {"type": "cell", "criteria": "==", "value": f'"{choice}"', "format": formats[choice]},
             )
-        self.checklist.data_validation(row, column, row, column, dict(validate="list", source=assessment_choices))
+        checklist.data_validation(row, column, row, column, dict(validate="list", source=assessment_choices))
 
     def __create_action_list(self) -> None:
         """Create a worksheet with room for actions from the self-assessment."""
@@ -2,14 +2,16 @@
 
 """Main program to convert Markdown files to different possible output formats."""
 
+import concurrent.futures
 import datetime
-import json
+import functools
 import logging
 import os
 import pathlib
 import pprint
-from typing import cast, List
-from xml.etree.ElementTree import ElementTree
+import subprocess
+from typing import cast, List, Set
+from xml.etree.ElementTree import ElementTree, fromstring, tostring
 
 from cli import parse_cli_arguments
 from converter import Converter
@@ -17,11 +19,32 @@ from builder import DocxBuilder, HTMLBuilder, HTMLCoverBuilder, PptxBuilder, Xls
 from markdown_converter import MarkdownConverter
 from custom_types import JSON, Settings, Variables
 
+try:
+    from orjson import loads as json_loads  # orjson is optional, but parses JSON faster than the json module
+except ImportError:
+    from json import loads as json_loads
+
+CREATED_FOLDERS: Set[pathlib.Path] = set()
+
 
 def read_json(json_filename: str) -> JSON:
-    """Read JSON from the specified filename."""
-    with open(json_filename, encoding="utf-8") as json_file:
-        return JSON(json.load(json_file))
+    """Read JSON from the specified filename. The JSON is cached, so callers should not change it."""
+    json_filename = os.path.abspath(json_filename)
+    return read_json_file(json_filename, os.stat(json_filename).st_mtime)
+
+
+@functools.lru_cache(maxsize=None)
+def read_json_file(json_filename: str, modification_time: float) -> JSON:  # pylint: disable=unused-argument
+    """Read JSON from the specified filename. The modification time is only used as part of the cache key."""
+    with open(json_filename, mode="rb") as json_file:
+        return JSON(json_loads(json_file.read()))
+
+
+def create_folder(folder: pathlib.Path) -> None:
+    """Create the folder, unless it was created before."""
+    if folder not in CREATED_FOLDERS:
+        folder.mkdir(parents=True, exist_ok=True)
+        CREATED_FOLDERS.add(folder)
 
 
 def write_xml(xml: ElementTree, settings: Settings) -> None:
@@ -34,27 +57,41 @@ def write_xml(xml: ElementTree, settings: Settings) -> None:
 def convert(settings_filename: str, version: str) -> None:
     """Convert the input document to the specified output formats."""
     # pylint: disable=unsubscriptable-object,unsupported-assignment-operation
-    settings = cast(Settings, read_json(settings_filename))
+    settings = cast(Settings, dict(read_json(settings_filename)))  # Copy the settings because we add the version
     variables = cast(Variables, {})
     for variable_file in settings["VariablesFiles"]:
         variables.update(cast(Variables, read_json(variable_file)))
     variables["VERSIE"] = settings["Version"] = version
     variables["DATUM"] = settings["Date"] = datetime.date.today().strftime("%d-%m-%Y")
     logging.info("Converting with settings:\n%s", pprint.pformat(settings))
-    output_path = pathlib.Path(settings["OutputPath"])
-    output_path.mkdir(parents=True, exist_ok=True)
-    build_path = pathlib.Path(settings["BuildPath"])
-    build_path.mkdir(parents=True, exist_ok=True)
+    create_folder(pathlib.Path(settings["OutputPath"]))
+    create_folder(pathlib.Path(settings["BuildPath"]))
     xml = MarkdownConverter(variables).convert(settings)
     write_xml(xml, settings)
-    converter = Converter(xml)
-    if "docx" in settings["OutputFormats"]:
+    # The output formats are independent of each other, so build them in parallel. Pass the XML as bytes to the
+    # worker processes so each process can parse its own copy.
+    xml_bytes = tostring(xml.getroot(), encoding="utf-8")
+    output_formats = list(settings["OutputFormats"])
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(len(output_formats), 1)) as executor:
+        jobs = [
+            executor.submit(convert_output_format, output_format, xml_bytes, settings, variables)
+            for output_format in output_formats
+        ]
+        for job in concurrent.futures.as_completed(jobs):
+            job.result()  # Raise the exception of the job, if any
+
+
+def convert_output_format(output_format: str, xml_bytes: bytes, settings: Settings, variables: Variables) -> None:
+    """Convert the xml to the output format."""
+    converter = Converter(ElementTree(fromstring(xml_bytes)))
+    output_path = pathlib.Path(settings["OutputPath"])
+    if output_format == "docx":
         convert_docx(converter, output_path, settings)
-    if "pdf" in settings["OutputFormats"]:
-        convert_pdf(converter, build_path, output_path, settings, variables)
-    if "pptx" in settings["OutputFormats"]:
+    elif output_format == "pdf":
+        convert_pdf(converter, pathlib.Path(settings["BuildPath"]), output_path, settings, variables)
+    elif output_format == "pptx":
         convert_pptx(converter, output_path, settings)
-    if "xlsx" in settings["OutputFormats"]:
+    elif output_format == "xlsx":
         convert_xlsx(converter, output_path, settings)
 
 
@@ -65,28 +102,40 @@ def convert_pdf(
     pdf_filename = output_path / settings["OutputFormats"]["pdf"]["OutputFile"]
     pdf_build_filename = build_path / pathlib.Path(settings["OutputFormats"]["pdf"]["OutputFile"])
     html_filename = build_path / pathlib.Path(settings["InputFile"]).with_suffix(".html").name
-    html_builder = HTMLBuilder(html_filename)
-    converter.convert(html_builder)
+    converter.convert(HTMLBuilder(html_filename))
     html_cover_filename = build_path / pathlib.Path(settings["InputFile"]).with_suffix(".cover.html").name
-    html_cover_builder = HTMLCoverBuilder(html_cover_filename)
-    converter.convert(html_cover_builder)
+    converter.convert(HTMLCoverBuilder(html_cover_filename))
     with open("DocumentDefinitions/Shared/header.html", encoding="utf-8") as header_template_file:
         header_contents = header_template_file.read() % variables["KWALITEITSAANPAK"]
     header_filename = build_path / "header.html"
     with open(header_filename, mode="w", encoding="utf-8") as header_file:
         header_file.write(header_contents)
-    os.system(
-        f"""wkhtmltopdf \
-        --enable-local-file-access \
-        --footer-html DocumentDefinitions/Shared/footer.html --footer-spacing 10 \
-        --header-html {header_filename} --header-spacing 10 \
-        --margin-bottom 27 --margin-left 34 --margin-right 34 --margin-top 27 \
-        --title '{settings["Title"]}' \
-        cover {html_cover_filename} \
-        {"toc --xsl-style-sheet DocumentDefinitions/Shared/toc.xsl" if settings["IncludeTableOfContents"] else ""} \
-        {html_filename} {pdf_build_filename}"""
+    wkhtmltopdf_command = [
+        "wkhtmltopdf",
+        "--enable-local-file-access",
+        *("--footer-html", "DocumentDefinitions/Shared/footer.html", "--footer-spacing", "10"),
+        *("--header-html", str(header_filename), "--header-spacing", "10"),
+        *("--margin-bottom", "27", "--margin-left", "34", "--margin-right", "34", "--margin-top", "27"),
+        *("--title", str(settings["Title"])),
+        *("cover", str(html_cover_filename)),
+    ]
+    if settings["IncludeTableOfContents"]:
+        wkhtmltopdf_command.extend(["toc", "--xsl-style-sheet", "DocumentDefinitions/Shared/toc.xsl"])
+    wkhtmltopdf_command.extend([str(html_filename), str(pdf_build_filename)])
+    subprocess.run(wkhtmltopdf_command, check=True)
+    subprocess.run(
+        [
+            "gs",
+            "-o",
+            str(pdf_filename),
+            "-sDEVICE=pdfwrite",
+            "-dPrinted=false",
+            "-f",
+            str(pdf_build_filename),
+            "src/pdfmark.txt",
+        ],
+        check=True,
     )
-    os.system(f"gs -o {pdf_filename} -sDEVICE=pdfwrite -dPrinted=false -f {pdf_build_filename} src/pdfmark.txt")
 
 
 def convert_docx(converter, output_path: pathlib.Path, settings: Settings) -> None:
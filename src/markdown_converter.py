@@ -17,6 +17,19 @@ class MarkdownConverter:
 
     APPENDIX_HEADING = "Bijlagen"
     APPENDIX_LEVEL = 1
+    # Formats by start marker. Start markers are one or two characters long:
+    FORMATS = {
+        markdown_syntax.BOLD_START: (markdown_syntax.BOLD_END, xmltags.BOLD),
+        markdown_syntax.BOLD_ALTERNATIVE_START: (markdown_syntax.BOLD_ALTERNATIVE_END, xmltags.BOLD),
+        markdown_syntax.INSTRUCTION_START: (markdown_syntax.INSTRUCTION_END, xmltags.INSTRUCTION),
+        markdown_syntax.ITALIC_START: (markdown_syntax.ITALIC_END, xmltags.ITALIC),
+        markdown_syntax.ITALIC_ALTERNATIVE_START: (markdown_syntax.ITALIC_ALTERNATIVE_END, xmltags.ITALIC),
+        markdown_syntax.STRIKETROUGH_START: (markdown_syntax.STRIKETROUGH_END, xmltags.STRIKETHROUGH),
+    }
+    # Characters that may start formatted text, a link, a variable, or an image:
+    FORMAT_CANDIDATE_PATTERN = re.compile(
+        "[" + re.escape("".join(sorted({md_start[0] for md_start in FORMATS})) + "[$!") + "]"
+    )
 
     def __init__(self, variables: Variables) -> None:
         self.builder = TreeBuilder()
@@ -37,7 +50,7 @@ class MarkdownConverter:
     def convert_markdown_file(self, markdown_filename: pathlib.Path, settings: Settings) -> None:
         """Convert markdown file to XML."""
         with open(markdown_filename, encoding="utf-8") as markdown_file:
-            for line in markdown_file.readlines():
+            for line in markdown_file:
                 if line.startswith("#include"):
                     filename = line.split(" ", maxsplit=1)[1].strip().strip('"')
                     filename = filename.replace(
@@ -126,27 +139,29 @@ class MarkdownConverter:
             self.end_lists()
             self.end_table()
             return  # Empty line, nothing further to do
-        if match := re.match(markdown_syntax.BEGIN_PATTERN, stripped_line):
+        match = markdown_syntax.LINE_PATTERN.match(stripped_line)
+        if match is None:
+            if stripped_line[0] == markdown_syntax.TABLE_MARKER:
+                self.process_table_row(stripped_line)
+            else:
+                with self.element(xmltags.PARAGRAPH):
+                    self.process_formatted_text(stripped_line)
+        elif match.lastgroup == "begin":
             attributes: dict[bytes | str, bytes | str] = {}
-            if attribute := match.group(2):
+            if attribute := match.group("begin_attribute"):
                 key, value = attribute.split("=")
                 attributes[key] = value
-            self.builder.start(match.group(1), attributes)
-        elif match := re.match(markdown_syntax.END_PATTERN, stripped_line):
-            self.builder.end(match.group(1))
-        elif match := re.match(markdown_syntax.HEADING_PATTERN, stripped_line):
-            self.process_heading(heading=match.group(2), level=len(match.group(1)))
-        elif re.match(markdown_syntax.BULLET_LIST_PATTERN, stripped_line):
+            self.builder.start(match.group("begin_tag"), attributes)
+        elif match.lastgroup == "end":
+            self.builder.end(match.group("end_tag"))
+        elif match.lastgroup == "heading":
+            self.process_heading(heading=match.group("heading_text"), level=len(match.group("heading_level")))
+        elif match.lastgroup == "bullet_list":
             list_level = {"*": 1, "+": 2, "-": 3}[stripped_line[0]]
-            self.process_list(stripped_line, xmltags.BULLET_LIST, list_level)
-        elif re.match(markdown_syntax.NUMBERED_LIST_PATTERN, stripped_line):
+            self.process_list(stripped_line[match.end() :], xmltags.BULLET_LIST, list_level)
+        else:  # Numbered list, the only remaining line pattern
             list_level = 1 if line[0].isdigit() else (3 if stripped_line[0].isdigit() else 2)
-            self.process_list(stripped_line, xmltags.NUMBERED_LIST, list_level)
-        elif stripped_line[0] == markdown_syntax.TABLE_MARKER:
-            self.process_table_row(stripped_line)
-        else:
-            with self.element(xmltags.PARAGRAPH):
-                self.process_formatted_text(stripped_line)
+            self.process_list(stripped_line[match.end() :], xmltags.NUMBERED_LIST, list_level)
 
     def process_heading(self, heading: str, level: int) -> None:
         """Process a heading."""
@@ -179,14 +194,14 @@ class MarkdownConverter:
             self.current_section_level -= 1
 
     def process_list(self, line: str, tag: str, list_level: int) -> None:
-        """Process a bullet or numbered list."""
+        """Process a bullet or numbered list item. The line should not contain the list marker."""
         self.start_lists(tag, list_level)
         self.end_lists(list_level)
         self.list_counter[list_level - 1] += 1
         number = str(self.list_counter[list_level - 1])
         attributes: TreeBuilderAttributes = {xmltags.LIST_ITEM_NUMBER: number} if tag == xmltags.NUMBERED_LIST else {}
         with self.element(xmltags.LIST_ITEM, attributes):
-            self.process_formatted_text(line.split(" ", maxsplit=1)[1])
+            self.process_formatted_text(line)
 
     def start_lists(self, tag: str, level: int) -> None:
         """Start (possibly nested) lists until the required level is reached."""
@@ -241,50 +256,51 @@ class MarkdownConverter:
 
     def process_formatted_text(self, line: str) -> None:
         """Process formatted Markdown text."""
-        seen = ""
-        formats = [
-            (markdown_syntax.BOLD_START, markdown_syntax.BOLD_END, xmltags.BOLD),
-            (markdown_syntax.BOLD_ALTERNATIVE_START, markdown_syntax.BOLD_ALTERNATIVE_END, xmltags.BOLD),
-            (markdown_syntax.INSTRUCTION_START, markdown_syntax.INSTRUCTION_END, xmltags.INSTRUCTION),
-            (markdown_syntax.ITALIC_START, markdown_syntax.ITALIC_END, xmltags.ITALIC),
-            (markdown_syntax.ITALIC_ALTERNATIVE_START, markdown_syntax.ITALIC_ALTERNATIVE_END, xmltags.ITALIC),
-            (markdown_syntax.STRIKETROUGH_START, markdown_syntax.STRIKETROUGH_END, xmltags.STRIKETHROUGH),
-        ]
+        seen: List[str] = []  # Plain text seen so far, joined when flushed
         while line:
             format_found = False
-            for md_start, md_end, xml_tag in formats:
-                if line.startswith(md_start) and md_end in line[len(md_start) :]:
+            for md_start in (line[:2], line[:1]):  # Try two character start markers first, e.g. "**" before "*"
+                if md_start not in self.FORMATS:
+                    continue
+                md_end, xml_tag = self.FORMATS[md_start]
+                if (md_end_index := line.find(md_end, len(md_start))) != -1:
                     format_found = True
-                    self.flush(seen)
-                    seen = ""
+                    self.flush("".join(seen))
+                    seen.clear()
                     with self.element(xml_tag):
                         if xml_tag == xmltags.INSTRUCTION:
                             self.builder.data(md_start)
-                        formatted_text, line = line[len(md_start) :].split(md_end, maxsplit=1)
-                        self.process_formatted_text(formatted_text)
+                        self.process_formatted_text(line[len(md_start) : md_end_index])
+                        line = line[md_end_index + len(md_end) :]
                         if xml_tag == xmltags.INSTRUCTION:
                             self.builder.data(md_end)
                     break
             else:
-                if match := re.match(markdown_syntax.LINK_PATTERN, line):
+                if line.startswith(markdown_syntax.LINK_START) and (
+                    match := markdown_syntax.LINK_PATTERN.match(line)
+                ):
                     format_found = True
-                    self.flush(seen)
-                    seen = ""
+                    self.flush("".join(seen))
+                    seen.clear()
                     match = cast(re.Match, match)
                     with self.element(xmltags.ANCHOR, {xmltags.ANCHOR_LINK: match.group(2)}):
                         self.process_formatted_text(match.group(1))
                     line = line[len(match.group(0)) :]
-                elif (match := re.match(markdown_syntax.VARIABLE_USE_PATTERN, line)) is not None:
+                elif line.startswith(markdown_syntax.VARIABLE_USE_START) and (
+                    match := markdown_syntax.VARIABLE_USE_PATTERN.match(line)
+                ):
                     format_found = True
-                    self.flush(seen)
-                    seen = ""
+                    self.flush("".join(seen))
+                    seen.clear()
                     match = cast(re.Match, match)
                     self.builder.data(self.variables[match.group(1)])
                     line = line[len(match.group(0)) :]
-                elif match := re.match(markdown_syntax.IMAGE_PATTERN, line):
+                elif line.startswith(markdown_syntax.IMAGE_START) and (
+                    match := markdown_syntax.IMAGE_PATTERN.match(line)
+                ):
                     format_found = True
-                    self.flush(seen)
-                    seen = ""
+                    self.flush("".join(seen))
+                    seen.clear()
                     match = cast(re.Match, match)
                     self.add_element(
                         xmltags.IMAGE,
@@ -297,9 +313,12 @@ class MarkdownConverter:
                     line = line[len(match.group(0)) :]
 
             if not format_found:
-                seen += line[0] if line else ""
-                line = line[1:]
-        self.flush(seen)
+                # Skip to the next character that may start formatted text instead of processing each character
+                candidate = self.FORMAT_CANDIDATE_PATTERN.search(line, 1)
+                plain_text_length = candidate.start() if candidate else len(line)
+                seen.append(line[:plain_text_length])
+                line = line[plain_text_length:]
+        self.flush("".join(seen))
 
     def end_document(self) -> None:
         """End the document."""
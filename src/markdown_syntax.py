@@ -1,21 +1,41 @@
 """Markdown syntax."""
 
-BEGIN_PATTERN = r"^<!-- begin: ([^ ]+)\s?([^ ]*) -->"
+import re
+
+BEGIN_PATTERN = re.compile(r"^<!-- begin: (?P<begin_tag>[^ ]+)\s?(?P<begin_attribute>[^ ]*) -->")
 BOLD_START = BOLD_END = "**"
 BOLD_ALTERNATIVE_START = BOLD_ALTERNATIVE_END = "__"
-BULLET_LIST_PATTERN = r"^[\*\+\-] "
+BULLET_LIST_PATTERN = re.compile(r"^[\*\+\-] ")
 CELL_ALIGNMENT_MARKER = ":"
-END_PATTERN = r"^<!-- end: ([^ ]+) -->"
-HEADING_PATTERN = r"^(#+) (.*)"
-IMAGE_PATTERN = r'^!\[([^\]]+)\]\(([^ ]+) "([^\)]+)"\)'
+END_PATTERN = re.compile(r"^<!-- end: (?P<end_tag>[^ ]+) -->")
+HEADING_PATTERN = re.compile(r"^(?P<heading_level>#+) (?P<heading_text>.*)")
+IMAGE_START = "!["
+IMAGE_PATTERN = re.compile(r'^!\[([^\]]+)\]\(([^ ]+) "([^\)]+)"\)')
 INSTRUCTION_START = "{"
 INSTRUCTION_END = "}"
 ITALIC_START = ITALIC_END = "_"
 ITALIC_ALTERNATIVE_START = ITALIC_ALTERNATIVE_END = "*"
-LINK_PATTERN = r"^\[([^\]]+)\]\(([^\)]+)\)"
+LINK_START = "["
+LINK_PATTERN = re.compile(r"^\[([^\]]+)\]\(([^\)]+)\)")
 MEASURE_START = "@{"
 MEASURE_END = "}@"
-NUMBERED_LIST_PATTERN = r"^[0-9A-Za-z]+\. "
+NUMBERED_LIST_PATTERN = re.compile(r"^[0-9A-Za-z]+\. ")
 STRIKETROUGH_START = STRIKETROUGH_END = "~~"
 TABLE_MARKER = "|"
-VARIABLE_USE_PATTERN = r"^\$([^\$]+)\$"
+VARIABLE_USE_START = "$"
+VARIABLE_USE_PATTERN = re.compile(r"^\$([^\$]+)\$")
+
+# The line patterns combined into one pattern, so each line is matched once. The name of the outer group that matched,
+# available as Match.lastgroup, tells which kind of line it is
+LINE_PATTERN = re.compile(
+    "|".join(
+        f"(?P<{name}>{pattern.pattern})"
+        for name, pattern in (
+            ("begin", BEGIN_PATTERN),
+            ("end", END_PATTERN),
+            ("heading", HEADING_PATTERN),
+            ("bullet_list", BULLET_LIST_PATTERN),
+            ("numbered_list", NUMBERED_LIST_PATTERN),
+        )
+    )
+)
@@ -0,0 +1,33 @@
+"""Docx builder unit tests."""
+
+import pathlib
+import tempfile
+import unittest
+import xml.etree.ElementTree
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from builder import DocxBuilder
+from converter import Converter
+
+
+class DocxBuilderTestCase(unittest.TestCase):
+    """Docx builder unit tests."""
+
+    REFERENCE_FILENAME = pathlib.Path(__file__).parent.parent / "DocumentDefinitions" / "reference.docx"
+
+    def test_formatted_text_in_anchor(self):
+        """Test that the tail of formatted text in an anchor is added as hyperlink."""
+        anchor = '<anchor link="https://x"><b>bold</b> text</anchor>'
+        tree = xml.etree.ElementTree.ElementTree(xml.etree.ElementTree.XML(f"<document><p>{anchor}</p></document>"))
+        with tempfile.TemporaryDirectory() as folder:
+            filename = pathlib.Path(folder) / "document.docx"
+            Converter(tree).convert(DocxBuilder(filename, self.REFERENCE_FILENAME))
+            document = Document(filename)
+        paragraph = document.paragraphs[-1]
+        self.assertEqual("bold", paragraph.runs[0].text)
+        self.assertTrue(paragraph.runs[0].bold)
+        hyperlink = paragraph._p.find(qn("w:hyperlink"))  # pylint: disable=protected-access
+        self.assertEqual([" text"], [t.text for t in hyperlink.iter(qn("w:t"))])
+        self.assertEqual("https://x", document.part.rels[hyperlink.get(qn("r:id"))].target_ref)
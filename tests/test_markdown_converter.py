@@ -120,6 +120,24 @@ class MarkdownTest(MarkdownConverterTestCase):
         self.assertEqual("Anchor", paragraph.find(xmltags.ANCHOR).text)
         self.assertEqual("link", paragraph.find(xmltags.ANCHOR).attrib[xmltags.ANCHOR_LINK])
 
+    @patch("markdown_converter.open", mock_open(read_data="Wow! It costs $5 and **bold** text"))
+    def test_plain_text_with_formatting_character(self):
+        """Test that formatting characters without a matching end marker are kept as plain text."""
+        paragraph = self.xml().find(xmltags.PARAGRAPH)
+        self.assertEqual("Wow! It costs $5 and ", paragraph.text)
+        self.assertEqual("bold", paragraph.find(xmltags.BOLD).text)
+        self.assertEqual(" text", paragraph.find(xmltags.BOLD).tail)
+
+    @patch("markdown_converter.open", mock_open(read_data="Text **bold* and __x_ end"))
+    def test_two_character_start_marker_without_end_marker(self):
+        """Test that a two character start marker without end marker is processed as a one character start marker."""
+        paragraph = self.xml().find(xmltags.PARAGRAPH)
+        self.assertIsNone(paragraph.find(xmltags.BOLD))
+        self.assertEqual("Text ", paragraph.text)
+        italics = paragraph.findall(xmltags.ITALIC)
+        self.assertEqual([None, None], [italic.text for italic in italics])
+        self.assertEqual(["bold* and ", "x_ end"], [italic.tail for italic in italics])
+
     @patch("markdown_converter.open", mock_open(read_data="* Bullet\n* list\n\n"))
     def test_bullet_list(self):
         """Test bullet list."""